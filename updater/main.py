@@ -14,6 +14,7 @@ from src import (
     ACCESS_TOKEN,
     calc_stargazers,
     calculate_age,
+    get_affiliated_repos,
     get_owned_repos,
     get_total_commits,
     get_total_loc,
@@ -24,7 +25,6 @@ from src import (
 
 if TYPE_CHECKING:
     from github.AuthenticatedUser import AuthenticatedUser
-    from github.PaginatedList import PaginatedList
     from github.Repository import Repository
 
     from src.consts import CacheDict
@@ -39,9 +39,14 @@ def main() -> None:
         auth=Token(token=ACCESS_TOKEN), per_page=100
     ).get_user()
 
-    cache: CacheDict = update_cache(user=user, emails=get_verified_emails(user))
+    affiliated_repos: list[Repository] = get_affiliated_repos(user)
+    owned_repos: list[Repository] = get_owned_repos(user, affiliated_repos)
 
-    owned_repos: PaginatedList[Repository] = get_owned_repos(user)
+    cache: CacheDict = update_cache(
+        user=user,
+        emails=get_verified_emails(user),
+        repos=affiliated_repos,
+    )
 
     age_str: str = calculate_age(datetime(2005, 7, 7, tzinfo=UTC))
     star_count: int = calc_stargazers(owned_repos)
@@ -52,7 +57,7 @@ def main() -> None:
     update_profile_cards(
         age=age_str,
         stars=star_count,
-        repos=owned_repos.totalCount,
+        repos=len(owned_repos),
         commits=commit_count,
         loc_total=loc_total,
         loc_add=loc_add,
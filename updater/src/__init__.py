@@ -8,7 +8,7 @@ from .cache import update_cache
 from .commits import get_total_commits
 from .consts import ACCESS_TOKEN
 from .loc import get_total_loc
-from .repos import calc_stargazers, get_owned_repos
+from .repos import calc_stargazers, get_affiliated_repos, get_owned_repos
 from .svg import update_profile_cards
 from .utils import calculate_age, get_verified_emails
 
@@ -16,6 +16,7 @@ __all__: list[str] = [
     "ACCESS_TOKEN",
     "calc_stargazers",
     "calculate_age",
+    "get_affiliated_repos",
     "get_owned_repos",
     "get_total_commits",
     "get_total_loc",
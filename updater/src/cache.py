@@ -4,19 +4,22 @@ Functions for handling the caching of statistics.
 
 from __future__ import annotations
 
-from json import JSONDecodeError, dump, load
+from json import JSONDecodeError, dumps, loads
 from typing import TYPE_CHECKING
 
 from github.GithubException import GithubException
 
-from .consts import CACHE_FILE, ENCODING, BranchData
-from .repos import calc_repo_data, get_affiliated_repos
-from .utils import hash_repo
+from .consts import CACHE_FILE, ENCODING
+from .repos import calc_repo_data
+from .utils import from_iso_z, hash_repo, to_iso_z
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from github.AuthenticatedUser import AuthenticatedUser
+    from github.Repository import Repository
 
-    from .consts import CacheDict, CachedRepo
+    from .consts import CacheDict, CachedRepo, RepoData
 
 
 class CacheError(Exception):
@@ -35,21 +38,25 @@ def get_cache() -> CacheDict:
     """
 
     try:
-        with CACHE_FILE.open(encoding=ENCODING, mode="r") as cache:
-            data: CacheDict = load(cache)
+        data: CacheDict = loads(CACHE_FILE.read_bytes())
     except (FileNotFoundError, JSONDecodeError):
         data = {}
 
     return data
 
 
-def update_cache(user: AuthenticatedUser, emails: set[str]) -> CacheDict:
+def update_cache(
+    user: AuthenticatedUser,
+    emails: frozenset[str],
+    repos: list[Repository],
+) -> CacheDict:
     """
-    Incrementally update cached statistics, write them, and return them.
+    Incrementally update cached statistics, write them if changed, and return them.
 
     Args:
         user:   User to cache stats for.
         emails: User's verified emails to check commit authorship.
+        repos:  Repositories the user is affiliated with.
 
     Return:
         CacheDict: Updated cache.
@@ -57,58 +64,115 @@ def update_cache(user: AuthenticatedUser, emails: set[str]) -> CacheDict:
     """
 
     data: CacheDict = get_cache()
+    changed: bool = False
 
-    for repo in get_affiliated_repos(user):
+    for repo in repos:
         repo_hash: str = hash_repo(repo.name)
-        prev: CachedRepo = data.get(repo_hash, {})
-        prev_branches: BranchData = prev.get("branches", {})  # type: ignore[reportAssignmentType]
+        prev: CachedRepo = data.get(repo_hash, _empty_repo())
+        last_pushed: str = prev.get("last_pushed", "")
+
+        if repo.pushed_at and last_pushed and repo.pushed_at <= from_iso_z(last_pushed):
+            # nothing has been pushed since the last successful run
+            continue
+
+        progress: RepoData = (0, 0, 0, 0, prev["branches"], prev.get("seen", []))
 
         try:
-            adds_d, dels_d, user_commits_d, commits_d, new_branches = calc_repo_data(
+            for progress in calc_repo_data(
                 user=user,
                 emails=emails,
                 repo=repo,
                 repo_hash=repo_hash,
-                branches=prev_branches,
-            )
+                cached=prev,
+            ):
+                # checkpoint every walked branch, in case a later one fails
+                data[repo_hash] = _add_deltas(prev, progress, last_pushed)
+                write_cache(data)
         except GithubException as e:
             print(f"Error processing repository: {e!s}")
             print()
-            print("Setting its deltas to 0.")
-            adds_d = dels_d = user_commits_d = commits_d = 0
-            new_branches = prev_branches
-
-        # get previous totals
-        prev_adds = int(prev.get("additions", 0))  # type: ignore[reportArgumentType]
-        prev_dels = int(prev.get("deletions", 0))  # type: ignore[reportArgumentType]
-        prev_user_commits = int(prev.get("user_commits", 0))  # type: ignore[reportArgumentType]
-        prev_commits = int(prev.get("commits", 0))  # type: ignore[reportArgumentType]
-
-        # add deltas
-        data[repo_hash] = {
-            "branches": new_branches,
-            "additions": prev_adds + adds_d,
-            "deletions": prev_dels + dels_d,
-            "user_commits": prev_user_commits + user_commits_d,
-            "commits": prev_commits + commits_d,
-        }
-
-    write_cache(data)
+            print("Keeping the deltas of its last checkpoint.")
+        else:
+            if repo.pushed_at:
+                last_pushed = to_iso_z(repo.pushed_at)
+
+        updated: CachedRepo = _add_deltas(prev, progress, last_pushed)
+
+        if data.get(repo_hash) != updated:
+            data[repo_hash] = updated
+            changed = True
+
+    if changed:
+        write_cache(data)
+
     return data
 
 
+def _add_deltas(prev: CachedRepo, progress: RepoData, last_pushed: str) -> CachedRepo:
+    """
+    Build a repository's cache entry from its previous one and new deltas.
+
+    Args:
+        prev:        Repository's previous cache entry.
+        progress:    Deltas, branch data and counted SHAs from `calc_repo_data`.
+        last_pushed: ISO8601 Z push date the entry is up to date with.
+
+    Return:
+        CachedRepo: Updated cache entry.
+
+    """
+
+    adds_d, dels_d, user_commits_d, commits_d, branches, seen = progress
+
+    return {
+        "branches": branches,
+        "additions": prev["additions"] + adds_d,
+        "deletions": prev["deletions"] + dels_d,
+        "user_commits": prev["user_commits"] + user_commits_d,
+        "commits": prev["commits"] + commits_d,
+        "seen": seen,
+        "last_pushed": last_pushed,
+    }
+
+
+def _empty_repo() -> CachedRepo:
+    """
+    Create the cache entry of a repository that hasn't been processed yet.
+
+    Return:
+        CachedRepo: Entry with no branches and zeroed statistics.
+
+    """
+
+    return {
+        "branches": {},
+        "additions": 0,
+        "deletions": 0,
+        "user_commits": 0,
+        "commits": 0,
+        "seen": [],
+        "last_pushed": "",
+    }
+
+
 def write_cache(data: CacheDict) -> None:
     """
     Write user's updated statistics to a cache file.
 
+    The data is written to a temporary sibling first and then swapped in,
+    so an interrupted run never leaves a truncated cache behind.
+
     Args:
         data: New statistics to be cached.
 
     """
 
+    tmp: Path = CACHE_FILE.with_suffix(".json.tmp")
+
     try:
-        with CACHE_FILE.open(encoding=ENCODING, mode="w") as cache:
-            dump(data, cache, indent=2, sort_keys=False)
+        tmp.write_text(dumps(data, indent=2, sort_keys=False), encoding=ENCODING)
+        tmp.replace(CACHE_FILE)
     except OSError as o:
+        tmp.unlink(missing_ok=True)
         msg = f"Failed to write cache: {o!s}"
         raise CacheError(msg) from o
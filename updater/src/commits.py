@@ -4,6 +4,7 @@ Functions for calculating commit statistics.
 
 from __future__ import annotations
 
+from operator import itemgetter
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -22,7 +23,4 @@ def get_total_commits(cached_data: CacheDict) -> int:
 
     """
 
-    return sum(
-        int(repo["user_commits"])  # type: ignore[reportArgumentType]
-        for repo in cached_data.values()
-    )
+    return sum(map(itemgetter("user_commits"), cached_data.values()))
@@ -7,22 +7,97 @@ from __future__ import annotations
 from hashlib import sha256
 from os import environ
 from pathlib import Path
+from typing import Any, NotRequired, TypedDict
 
 from dotenv import load_dotenv
 
-load_dotenv()
+if not {"ACCESS_TOKEN", "HASH_KEY", "USERNAME"} <= environ.keys():
+    # only local runs need the .env file, CI sets the variables directly
+    load_dotenv()
 
 BranchData = dict[str, dict[str, str]]
-CachedRepo = dict[str, int | BranchData]
+
+
+class CachedRepo(TypedDict):
+    """
+    Cached statistics of a single repository.
+    """
+
+    branches: BranchData
+    additions: int
+    deletions: int
+    user_commits: int
+    commits: int
+    seen: NotRequired[list[str]]
+    last_pushed: NotRequired[str]
+
+
 CacheDict = dict[str, CachedRepo]
-RepoData = tuple[int, int, int, int, BranchData]
+CommitNode = dict[str, Any]
+RepoData = tuple[int, int, int, int, BranchData, list[str]]
 
 ENCODING: str = "utf-8"
 ACCESS_TOKEN: str = environ["ACCESS_TOKEN"]
 HASH_KEY: bytes = environ["HASH_KEY"].encode(ENCODING)
 USERNAME: str = sha256(environ["USERNAME"].encode(ENCODING)).hexdigest()[:10]
 
+COMPARE_COMMIT_LIMIT: int = 250
 EMPTY_REPO_ERR: int = 409
+HISTORY_QUERY: str = """
+query (
+  $owner: String!
+  $name: String!
+  $oid: GitObjectID!
+  $since: GitTimestamp
+  $cursor: String
+) {
+  repository(owner: $owner, name: $name) {
+    object(oid: $oid) {
+      ... on Commit {
+        history(first: 100, since: $since, after: $cursor) {
+          pageInfo {
+            hasNextPage
+            endCursor
+          }
+          nodes {
+            oid
+            additions
+            deletions
+            author {
+              email
+              user {
+                databaseId
+                login
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+REFS_QUERY: str = """
+query ($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    refs(refPrefix: "refs/heads/", first: 100, after: $cursor) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        name
+        target {
+          oid
+          ... on Commit {
+            committedDate
+          }
+        }
+      }
+    }
+  }
+}
+"""
 JUST_LENGTHS: dict[str, int] = {
     "age_dots": 44,
     "stars_dots": 45,
@@ -28,7 +28,7 @@ def get_total_loc(
     dels: int = 0
 
     for repo in cached_data.values():
-        adds += int(repo.get("additions", 0))  # type: ignore[reportArgumentType]
-        dels += int(repo.get("deletions", 0))  # type: ignore[reportArgumentType]
+        adds += repo["additions"]
+        dels += repo["deletions"]
 
     return adds - dels, adds, dels
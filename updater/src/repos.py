@@ -4,44 +4,54 @@ Functions for calculating repository statistics.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from .utils import from_iso_z, hash_branch, is_user_commit, to_iso_z
+from github.GithubException import UnknownObjectException
+
+from .consts import COMPARE_COMMIT_LIMIT, HISTORY_QUERY
+from .utils import get_branch_heads, hash_branch, is_user_commit, to_iso_z
 
 if TYPE_CHECKING:
-    from datetime import datetime
+    from collections.abc import Iterator
 
     from github.AuthenticatedUser import AuthenticatedUser
-    from github.PaginatedList import PaginatedList
     from github.Repository import Repository
 
-    from .consts import BranchData, RepoData
+    from .consts import BranchData, CachedRepo, CommitNode, RepoData
 
 
 def calc_repo_data(
     user: AuthenticatedUser,
-    emails: set[str],
+    emails: frozenset[str],
     repo: Repository,
     repo_hash: str,
-    branches: BranchData,
-) -> RepoData:
+    cached: CachedRepo,
+) -> Iterator[RepoData]:
     """
     Incrementally calculate the user's authored data for a repository.
 
     Walk only commits that are new since the last run, per branch,
-    and dedupe SHAs across branches to avoid double-counting merges.
+    and dedupe SHAs across branches and runs to avoid double-counting merges.
+    The default branch is walked first, and branches seen for the first
+    time only count the commits they are ahead of it by.
+
+    The running totals are yielded after every walked branch, so callers
+    can checkpoint them and a failure mid-repository doesn't discard the
+    branches that were already processed.
 
     Args:
         user:      User whose commits will be processed.
         emails:    User's emails to check commit authorship.
         repo:      Repository to calculate data for.
         repo_hash: Hashed repository name.
-        branches:  Cached branch data (head SHA and last-seen date).
+        cached:    Repository's cache entry, with the head SHA and
+                   last-seen date of each branch and the SHAs of
+                   already counted commits. Left unmodified.
 
-    Returns:
+    Yields:
         RepoData: Tuple containing: new additions, new deletions,
                                     new user commits, new total commits,
-                                    new branch data.
+                                    new branch data, counted commit SHAs.
 
     Raises:
         GithubException: When something goes unavoidably wrong (request time-out).
@@ -56,55 +66,63 @@ def calc_repo_data(
     user_commits_d: int = 0
     commits_d: int = 0
 
-    processed: set[str] = set()
+    branches: BranchData = dict(cached["branches"])
+    seen: set[str] = set(cached.get("seen", []))
+    default_head: str = ""
 
-    for branch in repo.get_branches():
-        hashed_branch = hash_branch(branch.name, repo_hash)
+    for name, (head_sha, head_date) in sorted(
+        get_branch_heads(repo).items(),
+        key=lambda head: head[0] != repo.default_branch,
+    ):
+        hashed_branch = hash_branch(name, repo_hash)
         prev_branches: dict[str, str] = branches.get(hashed_branch, {})
         prev_head = prev_branches.get("head", "")
         last_seen = prev_branches.get("last_seen", "")
-        head_sha = branch.commit.sha
+
+        if name == repo.default_branch:
+            default_head = head_sha
 
         if prev_head == head_sha:
             continue
 
-        kwargs: dict[str, datetime] = {}
-        if last_seen != "":
-            kwargs["since"] = from_iso_z(last_seen)
+        ahead: set[str] | None = None
+        if not prev_head and name != repo.default_branch and default_head:
+            # new branch: whatever it shares with the default branch is counted
+            if head_sha == default_head:
+                prev_head = head_sha
+            else:
+                ahead = _ahead_commits(repo, default_head, head_sha)
 
-        for commit in repo.get_commits(sha=branch.name, **kwargs):  # type: ignore[reportArgumentType]
-            sha = commit.sha
+        for commit in _walk_history(repo, head_sha, last_seen, prev_head, ahead):
+            sha = commit["oid"]
 
-            if sha == prev_head:
-                break
-            if sha in processed:
+            if sha in seen:
                 continue
 
-            processed.add(sha)
+            seen.add(sha)
             commits_d += 1
 
             if is_user_commit(user, emails, commit):
-                stats = commit.stats
-                additions_d += stats.additions
-                deletions_d += stats.deletions
+                additions_d += commit["additions"]
+                deletions_d += commit["deletions"]
                 user_commits_d += 1
 
-        # safety first even if it means an absolutely degenerate get
-        head_date: datetime | None = getattr(  # type: ignore[reportAssignmentType]
-            getattr(getattr(branch.commit, "commit", None), "committer", None),
-            "date",
-            None,
-        )
-
         branches[hashed_branch] = {
             "head": head_sha,
-            "last_seen": to_iso_z(head_date),
+            "last_seen": head_date or to_iso_z(),
         }
 
-    return additions_d, deletions_d, user_commits_d, commits_d, branches
+        yield (
+            additions_d,
+            deletions_d,
+            user_commits_d,
+            commits_d,
+            dict(branches),
+            sorted(seen),
+        )
 
 
-def calc_stargazers(repos: PaginatedList[Repository]) -> int:
+def calc_stargazers(repos: list[Repository]) -> int:
     """
     Iterate through the given user's owned repositories and sum their stargazers.
 
@@ -119,7 +137,7 @@ def calc_stargazers(repos: PaginatedList[Repository]) -> int:
     return sum(repo.stargazers_count for repo in repos)
 
 
-def get_affiliated_repos(user: AuthenticatedUser) -> PaginatedList[Repository]:
+def get_affiliated_repos(user: AuthenticatedUser) -> list[Repository]:
     """
     Get all repositories a user has write-access to.
 
@@ -127,23 +145,129 @@ def get_affiliated_repos(user: AuthenticatedUser) -> PaginatedList[Repository]:
         user: User to get repo data for.
 
     Return:
-        PaginatedList[Repository]: Repos user can write to.
+        list[Repository]: Repos user can write to.
 
     """
 
-    return user.get_repos(affiliation="owner,collaborator,organization_member")
+    return list(user.get_repos(affiliation="owner,collaborator,organization_member"))
 
 
-def get_owned_repos(user: AuthenticatedUser) -> PaginatedList[Repository]:
+def get_owned_repos(
+    user: AuthenticatedUser, repos: list[Repository]
+) -> list[Repository]:
     """
-    Get all repositories a user owns.
+    Filter the repositories a user owns out of their affiliated repositories.
+
+    Ownership is part of every repo's payload, so this avoids paginating
+    the owned repos through a second listing.
 
     Args:
-        user: User to get repo data for.
+        user:  User to get repo data for.
+        repos: User's affiliated repos.
+
+    Return:
+        list[Repository]: User's owned repos.
+
+    """
+
+    return [repo for repo in repos if repo.owner.id == user.id]
+
+
+def _ahead_commits(repo: Repository, base_sha: str, head_sha: str) -> set[str] | None:
+    """
+    Find the commits reachable from a head but not from a base.
+
+    Args:
+        repo:     Repository the commits belong to.
+        base_sha: Commit to compare against.
+        head_sha: Commit whose extra history is wanted.
 
     Return:
-        PaginatedList[Repository]: User's owned repos.
+        set[str] | None: SHAs of the commits `head_sha` is ahead by,
+                         or `None` if there are too many to list or
+                         the commits don't share any history.
+
+    Raises:
+        GithubException: If the comparison fails for any other reason.
+
+    """
+
+    try:
+        comparison = repo.compare(base_sha, head_sha)
+    except UnknownObjectException:
+        return None
+
+    if comparison.ahead_by > COMPARE_COMMIT_LIMIT:
+        return None
+
+    return {commit.sha for commit in comparison.commits}
+
+
+def _walk_history(
+    repo: Repository,
+    head_sha: str,
+    since: str,
+    stop_sha: str,
+    only: set[str] | None = None,
+) -> Iterator[CommitNode]:
+    """
+    Lazily walk a commit's history through GraphQL, newest commits first.
+
+    Each page carries up to 100 commits along with their line stats and
+    author, so no per-commit REST request is needed. Pages are only
+    fetched as the caller consumes them.
+
+    Args:
+        repo:     Repository the commit belongs to.
+        head_sha: Commit to start walking from.
+        since:    ISO8601 Z string to stop at, or an empty string for
+                  the whole history.
+        stop_sha: Already counted commit to stop at (exclusive),
+                  or an empty string to walk until `since`.
+        only:     Commits to yield, stopping once all of them were found,
+                  or `None` to yield every commit. Left unmodified.
+
+    Yields:
+        CommitNode: Commits with their SHA, line stats and author.
+
+    Raises:
+        GithubException: If the GraphQL request fails.
 
     """
 
-    return user.get_repos(type="owner")
+    remaining: set[str] | None = None if only is None else set(only)
+    if head_sha == stop_sha or remaining == set():
+        return
+
+    variables: dict[str, Any] = {
+        "owner": repo.owner.login,
+        "name": repo.name,
+        "oid": head_sha,
+        "since": since or None,
+        "cursor": None,
+    }
+
+    while True:
+        _, data = repo.requester.graphql_query(HISTORY_QUERY, variables)
+        target: dict[str, Any] | None = data["data"]["repository"]["object"]
+        if target is None:
+            return
+
+        history: dict[str, Any] = target["history"]
+        for node in history["nodes"]:
+            if node["oid"] == stop_sha:
+                return
+
+            if remaining is None:
+                yield node
+            elif node["oid"] in remaining:
+                remaining.remove(node["oid"])
+                yield node
+
+                if not remaining:
+                    return
+
+        if not history["pageInfo"]["hasNextPage"]:
+            return
+
+        variables["cursor"] = history["pageInfo"]["endCursor"]
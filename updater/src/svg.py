@@ -37,17 +37,28 @@ def update_profile_cards(**kwargs: int | str) -> None:
         msg = "All statistics must be provided to update profile card."
         raise ValueError(msg)
 
-    _update_svg("dark_profile_card.svg", **kwargs)
-    _update_svg("light_profile_card.svg", **kwargs)
-
-
-def _update_svg(svg_name: str, **kwargs: int | str) -> None:
+    # both cards show the same text, so it's only formatted once
+    texts: dict[str, str] = {
+        "age": str(kwargs["age"]),
+        "stars": _fmt_thousands(int(kwargs["stars"])),
+        "repos": _fmt_thousands(int(kwargs["repos"])),
+        "commits": _fmt_thousands(int(kwargs["commits"])),
+        "loc_total": _fmt_total(int(kwargs["loc_total"])),
+        "loc_add": _fmt_add(int(kwargs["loc_add"])),
+        "loc_del": _fmt_del(int(kwargs["loc_del"])),
+    }
+
+    _update_svg("dark_profile_card.svg", texts)
+    _update_svg("light_profile_card.svg", texts)
+
+
+def _update_svg(svg_name: str, texts: dict[str, str]) -> None:
     """
     Update SVG file with new data.
 
     Args:
         svg_name: Image to be updated.
-        kwargs:   Keyword arguments corresponding to new stats.
+        texts:    Formatted stats, keyed by element ID.
 
     """
 
@@ -55,7 +66,7 @@ def _update_svg(svg_name: str, **kwargs: int | str) -> None:
 
     try:
         tree: LxmlTree = lxml_parse(svg_path, parser=None)
-        _update_elements(tree.getroot(), **kwargs)
+        _update_elements(tree.getroot(), texts)
         tree.write(svg_path, encoding="utf-8", xml_declaration=True)  # type: ignore[reportCallIssue]
     except (OSError, ParseError) as e:
         msg = f"SVG update failed: {e!s}"
@@ -78,8 +89,12 @@ def _fmt_del(v: int) -> str:
     return f"−{v:,}"
 
 
-def _set_text(root: LxmlElem, element_id: str, text: str) -> None:
-    el: Any = root.find(path=f".//*[@id='{element_id}']", namespaces=None)
+def _index_ids(root: LxmlElem) -> dict[str, LxmlElem]:
+    return {el.get("id"): el for el in root.iter("*") if el.get("id")}  # type: ignore[reportReturnType]
+
+
+def _set_text(by_id: dict[str, LxmlElem], element_id: str, text: str) -> None:
+    el: Any = by_id.get(element_id)
     if el is None:
         msg = f"Invalid or nonexistent element_id: {element_id!r}"
         raise ValueError(msg)
@@ -87,26 +102,21 @@ def _set_text(root: LxmlElem, element_id: str, text: str) -> None:
     el.text = text
 
 
-def _justify_from_dots(root: LxmlElem, dots_id: str, target_visible_len: int) -> None:
-    dots_el: Any = root.find(path=f".//*[@id='{dots_id}']", namespaces=None)
+def _justify_from_dots(
+    by_id: dict[str, LxmlElem], dots_id: str, target_visible_len: int
+) -> None:
+    dots_el: Any = by_id.get(dots_id)
     if dots_el is None:
         msg = f"Invalid or nonexistent dots_id: {dots_id!r}"
         raise ValueError(msg)
 
     y = dots_el.get("y")
-    parent = dots_el.getparent()
-    if parent is None:
-        return
-
-    children = list(parent)
-    try:
-        start_idx = children.index(dots_el) + 1
-    except ValueError:
+    if dots_el.getparent() is None:
         return
 
     visible_text: list[str] = []
-    for child in children[start_idx:]:
-        if child.tag.split("}")[-1] != "tspan":
+    for child in dots_el.itersiblings():
+        if child.tag.rpartition("}")[2] != "tspan":
             continue
         if child.get("y") != y:
             break
@@ -123,23 +133,20 @@ def _justify_from_dots(root: LxmlElem, dots_id: str, target_visible_len: int) ->
     dots_el.text = f" {'.' * needed} "
 
 
-def _update_elements(root: LxmlElem, **kwargs: int | str) -> None:
+def _update_elements(root: LxmlElem, texts: dict[str, str]) -> None:
     """
     Batch update all statistics.
 
     Args:
-        root:   Root XML element of image.
-        kwargs: Keyword arguments corresponding to new stats.
+        root:  Root XML element of image.
+        texts: Formatted stats, keyed by element ID.
 
     """
 
-    _set_text(root, "age", str(kwargs["age"]))
-    _set_text(root, "stars", _fmt_thousands(int(kwargs["stars"])))
-    _set_text(root, "repos", _fmt_thousands(int(kwargs["repos"])))
-    _set_text(root, "commits", _fmt_thousands(int(kwargs["commits"])))
-    _set_text(root, "loc_total", _fmt_total(int(kwargs["loc_total"])))
-    _set_text(root, "loc_add", _fmt_add(int(kwargs["loc_add"])))
-    _set_text(root, "loc_del", _fmt_del(int(kwargs["loc_del"])))
+    by_id: dict[str, LxmlElem] = _index_ids(root)
+
+    for element_id, text in texts.items():
+        _set_text(by_id, element_id, text)
 
     for dots_id, target in JUST_LENGTHS.items():
-        _justify_from_dots(root, dots_id, target)
+        _justify_from_dots(by_id, dots_id, target)
@@ -4,21 +4,37 @@ General utilities used by the script.
 
 from __future__ import annotations
 
+from calendar import monthrange
 from datetime import UTC, datetime
 from hashlib import sha256
 from hmac import new as new_hash
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from dateutil.relativedelta import relativedelta
 from github.GithubException import GithubException
 
-from .consts import ENCODING, HASH_KEY
+from .consts import ENCODING, HASH_KEY, REFS_QUERY
 
 if TYPE_CHECKING:
+    from hmac import HMAC
+
     from github.AuthenticatedUser import AuthenticatedUser
-    from github.Commit import Commit
     from github.Repository import Repository
 
+    from .consts import CommitNode
+
+# keyed once, so every hash only copies the padded inner and outer states
+_KEYED_HASHER: HMAC = new_hash(HASH_KEY, digestmod=sha256)
+_PLURAL_SUFFIX: tuple[str, str] = ("", "s")
+_STAT_TYPES: dict[str, type] = {
+    "age": str,
+    "stars": int,
+    "repos": int,
+    "commits": int,
+    "loc_total": int,
+    "loc_add": int,
+    "loc_del": int,
+}
+
 
 def calculate_age(bday: datetime) -> str:
     """
@@ -32,12 +48,19 @@ def calculate_age(bday: datetime) -> str:
 
     """
 
-    diff = relativedelta(datetime.now(tz=UTC), bday)
+    now = datetime.now(tz=UTC)
+    total_months = (now.year - bday.year) * 12 + now.month - bday.month
+    if _add_months(bday, total_months) > now:
+        total_months -= 1
+
+    years, months = divmod(total_months, 12)
+    days = (now - _add_months(bday, total_months)).days
+
     return (
-        f"{diff.years} year{'s' if diff.years != 1 else ''}, "
-        f"{diff.months} month{'s' if diff.months != 1 else ''}, "
-        f"{diff.days} day{'s' if diff.days != 1 else ''}"
-        f"{' !!!' if (diff.months == 0 and diff.days == 0) else ''}"
+        f"{_count_units(years, 'year')}, "
+        f"{_count_units(months, 'month')}, "
+        f"{_count_units(days, 'day')}"
+        f"{' !!!' if (months == 0 and days == 0) else ''}"
     )
 
 
@@ -53,42 +76,69 @@ def from_iso_z(s: str) -> datetime:
 
     """
 
-    return datetime.fromisoformat(s).astimezone(UTC)
+    dt = datetime.fromisoformat(s)
+    return dt if dt.tzinfo is UTC else dt.astimezone(UTC)
 
 
-def get_branch_heads(repo: Repository) -> dict[str, str]:
+def get_branch_heads(repo: Repository) -> dict[str, tuple[str, str]]:
     """
     Fetch the heads of all the branches in the given repository.
 
+    Uses a single GraphQL query per 100 branches, which also carries
+    each head's commit date, instead of listing branches over REST and
+    fetching every head commit separately.
+
     Args:
         repo: Repository whose branch heads will be fetched.
 
     Return:
-        dict[str, str]: Mapping of branches and branch heads.
+        dict[str, tuple[str, str]]: Mapping of branches to their head SHA
+                                    and its ISO8601 Z commit date.
+
+    Raises:
+        GithubException: If the GraphQL request fails.
 
     """
 
-    return {branch.name: branch.commit.sha for branch in repo.get_branches()}
+    heads: dict[str, tuple[str, str]] = {}
+    variables: dict[str, Any] = {
+        "owner": repo.owner.login,
+        "name": repo.name,
+        "cursor": None,
+    }
+
+    while True:
+        _, data = repo.requester.graphql_query(REFS_QUERY, variables)
+        refs: dict[str, Any] = data["data"]["repository"]["refs"]
+
+        for ref in refs["nodes"]:
+            target: dict[str, Any] = ref["target"]
+            heads[ref["name"]] = (target["oid"], target.get("committedDate", ""))
+
+        if not refs["pageInfo"]["hasNextPage"]:
+            return heads
 
+        variables["cursor"] = refs["pageInfo"]["endCursor"]
 
-def get_verified_emails(user: AuthenticatedUser) -> set[str]:
+
+def get_verified_emails(user: AuthenticatedUser) -> frozenset[str]:
     """
     Fetch all verified email addresses for the given user.
 
     Returns:
-        list[str]: User's verified emails.
+        frozenset[str]: User's verified emails, lowercased.
 
     """
 
     try:
-        return {
+        return frozenset(
             email_info.email.lower()
             for email_info in user.get_emails()
             if email_info.verified
-        }
+        )
     except GithubException as g:
         print(f"Warning: Could not fetch verified emails: {g!s}")
-        return set()
+        return frozenset()
 
 
 def hash_branch(branch_name: str, repo_hash: str) -> str:
@@ -104,11 +154,9 @@ def hash_branch(branch_name: str, repo_hash: str) -> str:
 
     """
 
-    return new_hash(
-        HASH_KEY,
-        f"{repo_hash}:{branch_name}".encode(ENCODING),
-        sha256,
-    ).hexdigest()
+    hasher: HMAC = _KEYED_HASHER.copy()
+    hasher.update(f"{repo_hash}:{branch_name}".encode(ENCODING))
+    return hasher.hexdigest()
 
 
 def hash_repo(name: str) -> str:
@@ -123,15 +171,19 @@ def hash_repo(name: str) -> str:
 
     """
 
-    return new_hash(HASH_KEY, name.encode(ENCODING), sha256).hexdigest()
+    hasher: HMAC = _KEYED_HASHER.copy()
+    hasher.update(name.encode(ENCODING))
+    return hasher.hexdigest()
 
 
-def is_user_commit(user: AuthenticatedUser, emails: set[str], commit: Commit) -> bool:
+def is_user_commit(
+    user: AuthenticatedUser, emails: frozenset[str], commit: CommitNode
+) -> bool:
     """
     Check if commit belongs to defined user.
 
     Args:
-        commit: Commit to check.
+        commit: GraphQL commit node to check.
         user:   User to check.
         emails: User's verified emails.
 
@@ -140,18 +192,17 @@ def is_user_commit(user: AuthenticatedUser, emails: set[str], commit: Commit) ->
 
     """
 
-    if commit.author and commit.author.id == user.id:
-        return True
+    author: dict[str, Any] = commit.get("author") or {}
+    account: dict[str, Any] | None = author.get("user")
 
-    if commit.commit and commit.commit.author:
-        commit_email: str = (
-            commit.commit.author.email.lower() if commit.commit.author.email else ""
-        )
+    if account and account.get("databaseId") == user.id:
+        return True
 
-        if commit_email in emails:
-            return True
+    commit_email: str | None = author.get("email")
+    if commit_email and commit_email.lower() in emails:
+        return True
 
-    return bool(commit.author and commit.author.login == user.login)
+    return bool(account and account.get("login") == user.login)
 
 
 def to_iso_z(dt: datetime | None = None) -> str:
@@ -169,8 +220,11 @@ def to_iso_z(dt: datetime | None = None) -> str:
 
     if dt is None:
         dt = datetime.now(tz=UTC)
+    elif dt.tzinfo is not UTC:
+        dt = dt.astimezone(UTC)
 
-    return dt.astimezone(UTC).isoformat().replace("+00:00", "Z")
+    # a UTC datetime always ends its ISO string with "+00:00"
+    return f"{dt.isoformat()[:-6]}Z"
 
 
 def validate_kwargs(**kwargs: int | str) -> bool:
@@ -185,15 +239,44 @@ def validate_kwargs(**kwargs: int | str) -> bool:
 
     """
 
-    return all(
-        key in kwargs and isinstance(kwargs[key], str if key == "age" else int)
-        for key in (
-            "age",
-            "stars",
-            "repos",
-            "commits",
-            "loc_total",
-            "loc_add",
-            "loc_del",
-        )
+    return kwargs.keys() >= _STAT_TYPES.keys() and all(
+        isinstance(kwargs[key], stat_type) for key, stat_type in _STAT_TYPES.items()
     )
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    """
+    Shift a datetime by whole months, clamping its day to the target month.
+
+    Args:
+        dt:     Datetime to shift.
+        months: Number of months to shift by.
+
+    Returns:
+        datetime: Shifted datetime (e.g. Jan 31 + 1 month is Feb 28/29).
+
+    """
+
+    year, month = divmod(dt.month - 1 + months, 12)
+    year += dt.year
+    month += 1
+
+    return dt.replace(
+        year=year, month=month, day=min(dt.day, monthrange(year, month)[1])
+    )
+
+
+def _count_units(count: int, unit: str) -> str:
+    """
+    Format a count followed by its unit, pluralized when needed.
+
+    Args:
+        count: Amount of `unit`.
+        unit:  Singular name of the unit.
+
+    Returns:
+        str: Formatted amount (e.g. "1 day", "2 days").
+
+    """
+
+    return f"{count} {unit}{_PLURAL_SUFFIX[count != 1]}"